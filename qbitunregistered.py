@@ -1,24 +1,22 @@
+import sys
 import json
 import argparse
 import os
+import atexit
+import queue
 import logging
-from qbittorrentapi import Client
+from logging.handlers import QueueHandler, QueueListener
+from qbittorrentapi import Client, exceptions
 from scripts.orphaned import check_files_on_disk
 from scripts.unregistered_checks import unregistered_checks
 from scripts.tag_by_tracker import tag_by_tracker
-from scripts.seeding_management import apply_seed_time, apply_seed_ratio
-from scripts.torrent_management import pause_torrents, resume_torrents
-from scripts.auto_remove import auto_remove
-from scripts.auto_tmm import apply_auto_tmm_per_torrent
-from scripts.create_hardlinks import create_hard_links
-from scripts.tag_by_age import tag_by_age
-from scripts.tag_by_tracker import tag_by_tracker
-from scripts.seeding_management import apply_seed_time, apply_seed_ratio
+from scripts.seeding_management import apply_seed_limits
 from scripts.torrent_management import pause_torrents, resume_torrents
 from scripts.auto_remove import auto_remove
 from scripts.auto_tmm import apply_auto_tmm_per_torrent
 from scripts.create_hardlinks import create_hard_links
 from scripts.tag_by_age import tag_by_age
+from scripts.utils import API_WORKERS
 
 # Set up command-line argument parsing
 parser = argparse.ArgumentParser(description="Manage torrents in qBittorrent by checking torrent tracker messages.")
@@ -75,9 +73,10 @@ dry_run = args.dry_run if args.dry_run is not None else config.get('dry_run', Fa
 exclude_files = args.exclude_files if args.exclude_files else config.get('exclude_files', [])
 exclude_dirs = args.exclude_dirs if args.exclude_dirs else config.get('exclude_dirs', [])
 
-# Connect to qBittorrent client
+# Connect to qBittorrent client, keeping one pooled connection per API worker
 try:
-    client = Client(host=config['host'], username=config['username'], password=config['password'])
+    client = Client(host=config['host'], username=config['username'], password=config['password'],
+                    HTTPADAPTER_ARGS={'pool_maxsize': API_WORKERS})
 except exceptions.APIConnectionError as e:
     logging.error(f"Failed to connect to qBittorrent: {e}")
     sys.exit(1)
@@ -92,6 +91,14 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
+# Write log records from a background thread
+log_queue = queue.Queue(-1)
+root_logger = logging.getLogger()
+log_listener = QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+root_logger.handlers = [QueueHandler(log_queue)]
+log_listener.start()
+atexit.register(log_listener.stop)
+
 # Log script start
 logging.info("Starting qbitunregistered script...")
 
@@ -117,8 +124,7 @@ if args.tag_by_age:
 
 # Apply seed time and seed ratio limits if --seeding-management argument is passed
 if args.seeding_management:
-    apply_seed_time(client, config, torrents)
-    apply_seed_ratio(client, config, torrents)
+    apply_seed_limits(client, config, torrents)
 
 # Run the apply_auto_tmm_per_torrent function if --auto-tmm argument is passed
 if args.auto_tmm:
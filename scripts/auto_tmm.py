@@ -1,10 +1,18 @@
 from qbittorrentapi import Client
 import logging
+from operator import attrgetter
+from scripts.utils import chunked
 
 def apply_auto_tmm_per_torrent(client, torrents):
-    for torrent in torrents:
+    torrent_hashes = list(map(attrgetter('hash'), torrents))
+    for batch in chunked(torrent_hashes):
         client.torrents_set_auto_management(
             enable=True,
-            torrent_hashes=[torrent.hash]
+            torrent_hashes=batch
         )
-        logging.info(f"Enabled auto TMM for torrent with name '{torrent.name}'")
+
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for torrent in torrents:
+            logging.debug("Enabled auto TMM for torrent with name '%s'", torrent.name)
+
+    logging.info("Enabled auto TMM for %d torrents.", len(torrent_hashes))
@@ -1,45 +1,208 @@
 import os
+import re
 import fnmatch
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, filterfalse
+from operator import itemgetter
+from typing import Callable, FrozenSet, Iterable, Iterator, List, Optional, Pattern, Set, Tuple
 import logging
+from scripts.utils import API_WORKERS, SCAN_WORKERS
 
-def check_files_on_disk(client, torrents: List, exclude_file_patterns: List[str] = [], exclude_dirs: List[str] = []) -> List[str]:
-    logging.debug("Entering check_files_on_disk function...")
+# Case-fold paths on case-insensitive platforms (Windows); None where normcase is a no-op
+_normcase = os.path.normcase if os.path.normcase('A') != 'A' else None
+
+def remove_nested_save_paths(save_paths) -> List[str]:
+    """Return the save paths sorted, dropping any path nested inside another one."""
+    # With a trailing separator, every child sorts directly after its parent
+    kept = []
+    for prefix in sorted({os.path.join(os.path.normpath(p), '') for p in save_paths if p}):
+        if kept and prefix.startswith(kept[-1]):
+            continue
+        kept.append(prefix)
+    return [os.path.normpath(prefix) for prefix in kept]
+
+def is_glob_pattern(pattern: str) -> bool:
+    return any(char in pattern for char in '*?[')
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a glob into a regular expression anchored at the end of the name."""
+    # Character classes need fnmatch's full translation
+    if '[' in pattern:
+        return fnmatch.translate(pattern)
+    return re.escape(pattern).replace(r'\*', '.*').replace(r'\?', '.') + r'\Z'
+
+def compile_patterns(patterns: List[str]) -> Optional[Pattern[str]]:
+    """Combine glob patterns into one regular expression, or None if there are none.
+
+    Matching is case-insensitive where the platform's paths are, as with fnmatch.
+    """
+    # Invalid patterns are reported and left out
+    regexes = []
+    for pattern in patterns:
+        regex = glob_to_regex(_normcase(pattern) if _normcase is not None else pattern)
+        try:
+            re.compile(regex)
+        except re.error as e:
+            logging.error("Ignoring invalid exclude pattern '%s': %s", pattern, e)
+            continue
+        regexes.append(regex)
+
+    if not regexes:
+        return None
+    flags = re.DOTALL if _normcase is None else re.DOTALL | re.IGNORECASE
+    return re.compile('|'.join(f'(?:{regex})' for regex in regexes), flags)
+
+def build_dir_filter(exclude_dirs: List[str]) -> Optional[Callable[[str], bool]]:
+    """Return a predicate telling whether a directory should be skipped during the walk.
+
+    Returns None when nothing is excluded so callers can skip the check entirely.
+    """
+    if not exclude_dirs:
+        return None
+
+    is_excluded_dir = build_dir_matcher([_normcase(d) for d in exclude_dirs] if _normcase is not None else exclude_dirs)
+    if _normcase is None:
+        return is_excluded_dir
+    # Like fnmatch, compare case-folded paths where the filesystem ignores case
+    return lambda path: is_excluded_dir(_normcase(path))
+
+def build_dir_matcher(exclude_dirs: List[str]) -> Callable[[str], bool]:
+    """Return a predicate matching a path against plain directories and glob patterns."""
+    # A single plain directory is the most common setup
+    if len(exclude_dirs) == 1 and not is_glob_pattern(exclude_dirs[0]):
+        excluded_dir = os.path.normpath(exclude_dirs[0])
+        return lambda path: path == excluded_dir
+
+    # Only real glob patterns need the regular expression
+    excluded_dirs = frozenset(os.path.normpath(d) for d in exclude_dirs if not is_glob_pattern(d))
+    dir_re = compile_patterns([d for d in exclude_dirs if is_glob_pattern(d)])
+    if dir_re is None:
+        return lambda path: path in excluded_dirs
+    return lambda path: path in excluded_dirs or dir_re.match(path) is not None
+
+def scan_directory(path: str, is_excluded_dir: Optional[Callable[[str], bool]]) -> Iterator[os.DirEntry]:
+    """Yield the files below path, skipping excluded directories and symlinked directories."""
+    # os.scandir reports file types from the directory listing, so most entries need no stat()
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Only symlinks need a stat() to tell whether they point at a file
+                    if entry.is_file(follow_symlinks=False):
+                        yield entry
+                    elif entry.is_dir(follow_symlinks=False):
+                        if is_excluded_dir is None or not is_excluded_dir(entry.path):
+                            pending.append(entry.path)
+                    elif entry.is_symlink() and entry.is_file():
+                        yield entry
+        except OSError as e:
+            logging.warning("Unable to scan directory %s: %s", directory, e)
+
+def get_torrent_paths(torrent) -> FrozenSet[str]:
+    """Return the normalized paths of a torrent's files."""
+    # File names are clean relative paths using '/', which normcase converts on Windows
+    prefix = os.path.join(os.path.normpath(torrent.save_path), '')
+    names = map(itemgetter('name'), torrent.files)
+    if _normcase is not None:
+        return frozenset(_normcase(prefix + name) for name in names)
+    return frozenset(prefix + name for name in names)
 
-    def should_exclude_file(file: str) -> bool:
-        return any(fnmatch.fnmatch(file, pattern) for pattern in exclude_file_patterns)
+def filter_orphans(paths: Iterable[str], torrent_files: FrozenSet[str]) -> Iterator[str]:
+    """Return an iterator over the paths that do not belong to any torrent."""
+    if _normcase is None:
+        return filterfalse(torrent_files.__contains__, paths)
+    return (path for path in paths if _normcase(path) not in torrent_files)
 
+def get_save_paths(client) -> Tuple[str, ...]:
+    """Return the de-duplicated default and category save paths of a client."""
     # Get the save paths to check
-    save_paths = {client.application.defaultSavePath}
+    default_save_path = client.application.defaultSavePath
+    save_paths = {default_save_path}
 
-    # Get the categories and their save paths
+    # Get the categories and their save paths. Categories without one live under
+    # <default>/<name>, and relative ones resolve against the default path.
     categories = client.torrent_categories.categories
-    save_paths.update(category['savePath'] for category in categories.values())
+    for name, category in categories.items():
+        category_path = category.get('savePath') or name
+        save_paths.add(os.path.join(default_save_path, category_path))
 
-    # Print out all the paths to be checked
-    for path in save_paths:
-        logging.info(f"Checking file path: {path}")
+    # Remove redundant subdirectories so no tree is walked twice
+    return tuple(remove_nested_save_paths(save_paths))
+
+def find_orphaned_files(client, torrents: List, exclude_file_patterns: List[str] = [], exclude_dirs: List[str] = []) -> Iterator[str]:
+    """Yield files below the qBittorrent save paths that do not belong to any torrent."""
+    save_paths = get_save_paths(client)
+
+    is_excluded_dir = build_dir_filter(exclude_dirs)
+    exclude_file_re = compile_patterns(exclude_file_patterns)
+    # A save path may also sit below a plain excluded directory
+    excluded_prefixes = tuple(os.path.join(os.path.normpath(d), '') for d in exclude_dirs if not is_glob_pattern(d))
+    if _normcase is not None:
+        excluded_prefixes = tuple(map(_normcase, excluded_prefixes))
+
+    is_excluded_file = exclude_file_re.match if exclude_file_re is not None else None
 
-    # Identify all torrent-associated files
-    torrent_files = [os.path.join(torrent.save_path, file.name) for torrent in torrents for file in torrent.files]
-    logging.debug(f"Torrent files: {torrent_files}")
+    # Set once the torrent file lists are in; the scans check files against them
+    torrent_files = None
+    torrent_files_ready = threading.Event()
 
-    all_files = []
+    def scan_save_path(path: str) -> List[str]:
+        files = (entry.path for entry in scan_directory(path, is_excluded_dir)
+                 if is_excluded_file is None or not is_excluded_file(entry.name))
+        # Files found before the torrent file lists arrive are held back; the
+        # rest are checked as they are found, so only orphans are kept.
+        unchecked = []
+        for file in files:
+            unchecked.append(file)
+            if torrent_files_ready.is_set():
+                break
+        torrent_files_ready.wait()
+        if torrent_files is None:
+            return []
+        return list(filter_orphans(chain(unchecked, files), torrent_files))
+
+    scan_paths = []
     for path in save_paths:
-        for root, dirs, files in os.walk(path, topdown=True):
-            dirs[:] = [d for d in dirs if not any(fnmatch.fnmatch(os.path.join(root, d), pattern) for pattern in exclude_dirs)]
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                if not any(fnmatch.fnmatch(file, pattern) for pattern in exclude_files) and not should_exclude_file(file):
-                    all_files.append(file_path)
-
-    logging.debug(f"All files: {all_files}")
-
-    # Identify orphaned files: those that exist in the file system but not in the list of torrent-associated files
-    orphaned_files = [file for file in all_files if file not in torrent_files]
-    logging.info("Orphaned files:")
-    for file_path in orphaned_files:
-        logging.info(file_path)
+        # Skip roots that are excluded themselves
+        if is_excluded_dir is not None and (is_excluded_dir(path) or os.path.join(_normcase(path) if _normcase is not None else path, '').startswith(excluded_prefixes)):
+            logging.info("Skipping excluded save path: %s", path)
+            continue
+
+        if not os.path.isdir(path):
+            logging.warning("Save path %s does not exist or is not a directory, skipping.", path)
+            continue
+
+        logging.info("Checking file path: %s", path)
+        scan_paths.append(path)
+
+    if not scan_paths:
+        return
+
+    # Scan the save paths concurrently while the torrent file lists are fetched
+    with ThreadPoolExecutor(max_workers=API_WORKERS) as api_executor, \
+            ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(scan_paths))) as executor:
+        scanned_orphans = executor.map(scan_save_path, scan_paths)
+
+        # Identify all torrent-associated files
+        try:
+            torrent_files = frozenset().union(*api_executor.map(get_torrent_paths, torrents))
+        finally:
+            # Release the scans even when a file list request failed
+            torrent_files_ready.set()
+        logging.debug("Torrent files: %s", torrent_files)
+
+        for orphans in scanned_orphans:
+            yield from orphans
+
+def check_files_on_disk(client, torrents: List, exclude_file_patterns: List[str] = [], exclude_dirs: List[str] = []) -> Set[str]:
+    logging.debug("Entering check_files_on_disk function...")
+
+    orphaned_files = set(find_orphaned_files(client, torrents, exclude_file_patterns, exclude_dirs))
+    # Log all orphaned files in a single record
+    if orphaned_files:
+        logging.info("Orphaned files (%d):\n%s", len(orphaned_files), "\n".join(sorted(orphaned_files)))
 
     return orphaned_files
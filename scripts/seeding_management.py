@@ -1,30 +1,11 @@
-from qbittorrentapi import Client
-import logging
+from scripts.tag_by_tracker import apply_share_limits, get_share_limits, match_tracker_configs
 
-def apply_seed_time(client, config):
-    torrents = client.torrents.info()
+def apply_seed_limits(client, config, torrents):
+    """Apply the tracker_tags seed time and seed ratio limits to matching torrents."""
+    limit_groups = {}
+    for torrent, tracker_tag_config in match_tracker_configs(torrents, config):
+        limits = get_share_limits(torrent, tracker_tag_config)
+        if limits is not None:
+            limit_groups.setdefault(limits, []).append(torrent.hash)
 
-    for torrent in torrents:
-        for tracker in torrent.trackers:
-            tracker_tag_config = config.get('tracker_tags', {}).get(tracker.host)
-
-            if tracker_tag_config is not None:
-                seed_time_limit = tracker_tag_config.get('seed_time_limit')
-
-                if seed_time_limit is not None:
-                    client.torrents_edit(torrent.hash, seeding_time_limit=seed_time_limit)
-                    logging.info(f"Updated seeding time limit for torrent with name '{torrent.name}' to {seed_time_limit} minutes.")
-
-def apply_seed_ratio(client, config):
-    torrents = client.torrents.info()
-
-    for torrent in torrents:
-        for tracker in torrent.trackers:
-            tracker_tag_config = config.get('tracker_tags', {}).get(tracker.host)
-
-            if tracker_tag_config is not None:
-                seed_ratio_limit = tracker_tag_config.get('seed_ratio_limit')
-
-                if seed_ratio_limit is not None:
-                    client.torrents_edit(torrent.hash, ratio_limit=seed_ratio_limit)
-                    logging.info(f"Updated seed ratio limit for torrent with name '{torrent.name}' to {seed_ratio_limit}.")
\ No newline at end of file
+    apply_share_limits(client, limit_groups)
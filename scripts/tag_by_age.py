@@ -1,31 +1,44 @@
 import logging
+import time
 import datetime
+from bisect import bisect_right
+from scripts.utils import add_tag, has_tag
+
+# Age tags indexed by how many of the last six month starts a torrent was added on or after
+AGE_TAGS = ('6_months_plus', '>6_months', '>5_months', '>4_months', '>3_months', '>2_months', '>1_month')
+
+def month_start_timestamps(count):
+    """Return the timestamps at which each of the last `count` calendar months began, most recent first."""
+    today = datetime.date.today()
+    current_month = today.year * 12 + today.month - 1
+    starts = []
+    for offset in range(1, count + 1):
+        year, month = divmod(current_month - offset, 12)
+        # Local midnight on the first of the month, matching fromtimestamp's local time
+        starts.append(time.mktime((year, month + 1, 1, 0, 0, 0, 0, 0, -1)))
+    return starts
 
 def tag_by_age(client, torrents, config):
-    current_time = datetime.datetime.now()
+    # A torrent is at most N months old when it was added on or after the start
+    # of the month N months back. With the month starts oldest first, the number
+    # of them at or before added_on is the index into AGE_TAGS.
+    boundaries = month_start_timestamps(len(AGE_TAGS) - 1)[::-1]
+    tag_groups = [[] for _ in AGE_TAGS]
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
 
     for torrent in torrents:
-        # Calculate the age of the torrent in months
-        torrent_age_months = (current_time.year - torrent.creation_date.year) * 12 + (current_time.month - torrent.creation_date.month)
-
-        # Determine the appropriate tag based on age buckets in months
-        if torrent_age_months <= 1:
-            tag = '>1_month'
-        elif torrent_age_months <= 2:
-            tag = '>2_months'
-        elif torrent_age_months <= 3:
-            tag = '>3_months'
-        elif torrent_age_months <= 4:
-            tag = '>4_months'
-        elif torrent_age_months <= 5:
-            tag = '>5_months'
-        elif torrent_age_months <= 6:
-            tag = '>6_months'
-        else:
-            tag = '6_months_plus'
+        bucket = bisect_right(boundaries, torrent.added_on)
+        tag = AGE_TAGS[bucket]
+        if has_tag(torrent, tag):
+            continue
+        tag_groups[bucket].append(torrent.hash)
+        if debug_enabled:
+            logging.debug("Torrent with name '%s' tagged '%s'", torrent.name, tag)
 
-        # Add the tag to the torrent
-        client.torrents_add_tags(torrent_hashes=[torrent.hash], tags=[tag])
-        logging.info(f"Added tag '{tag}' to torrent with name '{torrent.name}'")
+    for tag, torrent_hashes in zip(AGE_TAGS, tag_groups):
+        if not torrent_hashes:
+            continue
+        add_tag(client, tag, torrent_hashes)
+        logging.info("Added tag '%s' to %d torrents", tag, len(torrent_hashes))
 
     logging.info("Tagging by age buckets in months completed.")
@@ -1,27 +1,91 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from urllib.parse import urlsplit
+from scripts.utils import API_WORKERS, add_tag, chunked, has_tag
+
+# A few tracker URLs are shared by many torrents; parse each only once
+@lru_cache(maxsize=4096)
+def get_tracker_host(url):
+    """Return the host name of a tracker URL, or an empty string for DHT, PeX and LSD entries."""
+    return urlsplit(url).hostname or ''
+
+def find_tracker_config(host, tracker_terms):
+    """Return the config of the first lowercased term that appears in the tracker host, or None."""
+    for term, tracker_tag_config in tracker_terms:
+        if term in host:
+            return tracker_tag_config
+    return None
+
+def match_tracker_configs(torrents, config):
+    """Yield each torrent with the tracker_tags config of its first configured tracker host."""
+    # Lowercase the configured terms once; urlsplit already lowercases host names
+    tracker_terms = [(term.lower(), tracker_tag_config) for term, tracker_tag_config in config.get('tracker_tags', {}).items()]
+    # Config per host, resolved once per run
+    tracker_configs = {}
+
+    # Each tracker list is a separate API request; fetch them concurrently
+    with ThreadPoolExecutor(max_workers=API_WORKERS) as executor:
+        torrent_trackers = list(executor.map(attrgetter('trackers'), torrents))
+
+    for torrent, trackers in zip(torrents, torrent_trackers):
+        # Check each distinct host once, in order, up to the first configured one
+        for host in dict.fromkeys(get_tracker_host(tracker.url) for tracker in trackers):
+            if host not in tracker_configs:
+                tracker_configs[host] = find_tracker_config(host, tracker_terms)
+            if tracker_configs[host] is not None:
+                yield torrent, tracker_configs[host]
+                break
+
+def get_share_limits(torrent, tracker_tag_config):
+    """Return the (ratio, seeding time, inactive seeding time) limits a tracker config sets, or None."""
+    seed_ratio_limit = tracker_tag_config.get('seed_ratio_limit')
+    seed_time_limit = tracker_tag_config.get('seed_time_limit')
+    if seed_ratio_limit is None and seed_time_limit is None:
+        return None
+
+    # qBittorrent sets the ratio and seeding time limits together, so a limit
+    # that is not configured keeps the torrent's current value.
+    return (
+        seed_ratio_limit if seed_ratio_limit is not None else torrent.ratio_limit,
+        seed_time_limit if seed_time_limit is not None else torrent.seeding_time_limit,
+        getattr(torrent, 'inactive_seeding_time_limit', None),
+    )
+
+def apply_share_limits(client, limit_groups):
+    """Set each combination of share limits on all of its torrents in bulk requests."""
+    for (ratio_limit, seeding_time_limit, inactive_seeding_time_limit), torrent_hashes in limit_groups.items():
+        for batch in chunked(torrent_hashes):
+            client.torrents_set_share_limits(
+                ratio_limit=ratio_limit,
+                seeding_time_limit=seeding_time_limit,
+                inactive_seeding_time_limit=inactive_seeding_time_limit,
+                torrent_hashes=batch
+            )
+        logging.info("Set ratio limit %s and seeding time limit %s minutes for %d torrents", ratio_limit, seeding_time_limit, len(torrent_hashes))
 
 def tag_by_tracker(client, torrents, config):
-    for torrent in torrents:
-        for tracker in torrent.trackers:
-            tracker_tag_config = config.get('tracker_tags', {}).get(tracker.host)
-
-            if tracker_tag_config is not None:
-                tag = tracker_tag_config.get('tag')
-                seed_time_limit = tracker_tag_config.get('seed_time_limit')
-                seed_ratio_limit = tracker_tag_config.get('seed_ratio_limit')
-
-                # Add the tag to the torrent
-                client.torrents_add_tags(torrent_hashes=[torrent.hash], tags=[tag])
-                logging.info(f"Added tag '{tag}' to torrent with name '{torrent.name}'")
-
-                # Apply seed time limit if provided
-                if seed_time_limit is not None:
-                    client.torrents_edit(torrent.hash, seeding_time_limit=seed_time_limit)
-                    logging.info(f"Updated seeding time limit for torrent with name '{torrent.name}' to {seed_time_limit} minutes.")
-
-                # Apply seed ratio limit if provided
-                if seed_ratio_limit is not None:
-                    client.torrents_edit(torrent.hash, ratio_limit=seed_ratio_limit)
-                    logging.info(f"Updated seed ratio limit for torrent with name '{torrent.name}' to {seed_ratio_limit}.")
+    tag_groups = {}
+    limit_groups = {}
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    for torrent, tracker_tag_config in match_tracker_configs(torrents, config):
+        tag = tracker_tag_config.get('tag')
+
+        if not has_tag(torrent, tag):
+            tag_groups.setdefault(tag, []).append(torrent.hash)
+            if debug_enabled:
+                logging.debug("Tagging torrent with name '%s' as '%s'", torrent.name, tag)
+
+        limits = get_share_limits(torrent, tracker_tag_config)
+        if limits is not None:
+            limit_groups.setdefault(limits, []).append(torrent.hash)
+
+    for tag, torrent_hashes in tag_groups.items():
+        add_tag(client, tag, torrent_hashes)
+        logging.info("Added tag '%s' to %d torrents", tag, len(torrent_hashes))
+
+    apply_share_limits(client, limit_groups)
 
     logging.info("Tagging by tracker completed.")
@@ -1,18 +1,18 @@
 import logging
+from operator import attrgetter
+from scripts.utils import chunked
 from qbittorrentapi import Client
 
 def pause_torrents(client, torrents):
-    total_paused = 0
-    for torrent in torrents:
-        client.torrents_pause(torrent.hash)
-        total_paused += 1
+    torrent_hashes = list(map(attrgetter('hash'), torrents))
+    for batch in chunked(torrent_hashes):
+        client.torrents_pause(torrent_hashes=batch)
 
-    logging.info("Paused %d torrents.", total_paused)
+    logging.info("Paused %d torrents.", len(torrent_hashes))
 
 def resume_torrents(client, torrents):
-    total_resumed = 0
-    for torrent in torrents:
-        client.torrents_resume(torrent.hash)
-        total_resumed += 1
+    torrent_hashes = list(map(attrgetter('hash'), torrents))
+    for batch in chunked(torrent_hashes):
+        client.torrents_resume(torrent_hashes=batch)
 
-    logging.info("Resumed %d torrents.", total_resumed)
+    logging.info("Resumed %d torrents.", len(torrent_hashes))
@@ -1,77 +1,103 @@
 import logging
-from urllib.parse import urlsplit
+from collections import defaultdict
+from scripts.utils import add_tag, chunked, has_tag
 
-def check_unregistered_message(tracker, unregistered):
-    lower_unregistered = {pattern.lower() for pattern in unregistered}
-    lower_msg = tracker.msg.lower()
+def compile_unregistered_patterns(unregistered):
+    """Split the unregistered patterns into lowercased exact messages and 'starts_with:' prefixes."""
+    exact_messages = set()
+    message_prefixes = []
+    for pattern in unregistered:
+        pattern = pattern.lower()
+        if pattern.startswith("starts_with:"):
+            message_prefixes.append(pattern[len("starts_with:"):])
+        else:
+            exact_messages.add(pattern)
+    return frozenset(exact_messages), tuple(message_prefixes)
 
-    for pattern in lower_unregistered:
-        if pattern.startswith("starts_with:") and lower_msg.startswith(pattern.split("starts_with:")[1]):
-            return True
-        elif lower_msg == pattern:
-            return True
+def check_unregistered_message(lower_msg, exact_messages, message_prefixes):
+    return lower_msg in exact_messages or lower_msg.startswith(message_prefixes)
 
+def has_unregistered_tracker(torrent, exact_messages, message_prefixes):
+    for tracker in torrent.trackers:
+        # Only trackers marked not working (status 4) report an unregistered torrent
+        if tracker.status != 4:
+            continue
+        if check_unregistered_message(tracker.msg.lower(), exact_messages, message_prefixes):
+            return True
     return False
 
-def process_torrent(torrent, unregistered):
-    lower_unregistered = {pattern.lower() for pattern in unregistered}
-    unregistered_count = sum(
-        1
-        for tracker in torrent.trackers
-        if check_unregistered_message(tracker, lower_unregistered) and tracker.status == 4
-    )
-    return unregistered_count
-
 def update_torrent_file_paths(torrent_file_paths, torrent):
-    torrent_file_paths.setdefault(torrent.save_path, []).append(torrent.hash)
+    torrent_file_paths[torrent.save_path].append(torrent.hash)
+
+def delete_torrents_and_files(client, torrents, added_tags, config, use_delete_tags, delete_tags, delete_files, dry_run):
+    # added_tags maps hash -> tag for the torrents this run tagged after they were fetched
+    if not use_delete_tags:
+        return
+
+    delete_tag_files = [(tag, delete_files.get(tag, False)) for tag in delete_tags]
+    action = "Deleted" if not dry_run else "[Dry Run] Would delete"
+    hashes_by_delete_files = {True: [], False: []}
+
+    for torrent in torrents:
+        added_tag = added_tags.get(torrent.hash)
+        for tag, tag_deletes_files in delete_tag_files:
+            if has_tag(torrent, tag) or tag == added_tag:
+                hashes_by_delete_files[tag_deletes_files].append(torrent.hash)
+                if tag_deletes_files:
+                    logging.info("%s torrent '%s' with hash %s and its files.", action, torrent.name, torrent.hash)
+                else:
+                    logging.info("%s torrent '%s' with hash %s.", action, torrent.name, torrent.hash)
+                break  # Exit the inner loop once the torrent is selected for deletion
 
-def delete_torrents_and_files(client, config, use_delete_tags, delete_tags, delete_files, dry_run):
-    if use_delete_tags:
-        for torrent in client.torrents.info():
-            for tag in delete_tags:
-                if tag in torrent.tags:
-                    if delete_files.get(tag, False):
-                        action = "Deleted" if not dry_run else "[Dry Run] Would delete"
-                        client.torrents.delete(torrent.hash, delete_files=True)
-                        logging.info(f"{action} torrent '{torrent.name}' with hash {torrent.hash} and its files.")
-                    else:
-                        action = "Deleted" if not dry_run else "[Dry Run] Would delete"
-                        client.torrents.delete(torrent.hash, delete_files=False)
-                        logging.info(f"{action} torrent '{torrent.name}' with hash {torrent.hash}.")
-                    break  # Exit the inner loop after deleting the torrent
+    # A dry run only reports what it would delete
+    if not dry_run:
+        for tag_deletes_files, torrent_hashes in hashes_by_delete_files.items():
+            for batch in chunked(torrent_hashes):
+                client.torrents.delete(delete_files=tag_deletes_files, torrent_hashes=batch)
 
 def unregistered_checks(client, torrents, config, use_delete_tags, delete_tags, delete_files, dry_run):
-    torrent_file_paths = {}
-    unregistered_counts_per_path = {}
-    tag_counts = {}
+    torrent_file_paths = defaultdict(list)
+    unregistered_counts_per_path = defaultdict(int)
+    tag_counts = defaultdict(int)
     default_tag = config['default_unregistered_tag']
     cross_seeding_tag = config['cross_seeding_tag']
+    exact_messages, message_prefixes = compile_unregistered_patterns(config.get('unregistered', []))
     
+    unregistered_torrents = []
     for torrent in torrents:
         update_torrent_file_paths(torrent_file_paths, torrent)
 
-        # Pass the 'unregistered' argument to the process_torrent function
-        unregistered_count = process_torrent(torrent, config.get('unregistered'))
+        # Count unregistered torrents, not trackers, so the count per save path
+        # can be compared with the number of torrents in that path below
+        if has_unregistered_tracker(torrent, exact_messages, message_prefixes):
+            unregistered_counts_per_path[torrent.save_path] += 1
+            unregistered_torrents.append(torrent)
 
-        unregistered_counts_per_path[torrent.save_path] = unregistered_counts_per_path.get(torrent.save_path, 0) + unregistered_count
+    # Tags are only decided once every torrent of a save path has been counted,
+    # so whether a path is fully unregistered does not depend on torrent order.
+    tag_hashes = defaultdict(list)
+    for torrent in unregistered_torrents:
+        save_path = torrent.save_path
+        is_all_unregistered = unregistered_counts_per_path[save_path] == len(torrent_file_paths[save_path])
+        tag = default_tag if is_all_unregistered else cross_seeding_tag
+        tag_counts[tag] += 1
+        if has_tag(torrent, tag):
+            continue
+        tag_hashes[tag].append(torrent.hash)
+        if not dry_run:
+            logging.info("Adding tags %s to torrent with name '%s'", [tag], torrent.name)
+        else:
+            logging.info("[Dry Run] Would add tags %s to torrent with name '%s'", [tag], torrent.name)
 
-        # Add tags based on unregistered_count
-        if unregistered_count > 0:
-            is_all_unregistered = unregistered_counts_per_path[torrent.save_path] == len(torrent_file_paths[torrent.save_path])
-            tags_to_add = [default_tag] if is_all_unregistered else [cross_seeding_tag]
-            if not dry_run:
-                client.torrents_add_tags(torrent_hashes=[torrent.hash], tags=tags_to_add)
-                logging.info(f"Adding tags {tags_to_add} to torrent with name '{torrent.name}'")
-                for tag in tags_to_add:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
-            else:
-                logging.info(f"[Dry Run] Would add tags {tags_to_add} to torrent with name '{torrent.name}'")
-                for tag in tags_to_add:
-                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    if not dry_run:
+        for tag, torrent_hashes in tag_hashes.items():
+            add_tag(client, tag, torrent_hashes)
 
-    delete_torrents_and_files(client, config, use_delete_tags, delete_tags, delete_files, dry_run)
+    added_tags = {torrent_hash: tag for tag, torrent_hashes in tag_hashes.items() for torrent_hash in torrent_hashes}
+    delete_torrents_and_files(client, torrents, added_tags, config, use_delete_tags, delete_tags, delete_files, dry_run)
 
     for tag, count in tag_counts.items():
         logging.info("Tag: %s, Count: %d", tag, count)
 
-    return torrent_file_paths, unregistered_counts_per_path
+    # Plain dicts for callers, so a lookup of a missing path cannot insert it
+    return dict(torrent_file_paths), dict(unregistered_counts_per_path)
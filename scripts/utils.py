@@ -0,0 +1,27 @@
+def has_tag(torrent, tag):
+    """Return True if the torrent already carries the tag."""
+    # qBittorrent reports tags as a single comma-separated string; compare whole
+    # tags so 'unregistered' does not match 'unregistered:crossseeding'.
+    return tag in (existing.strip() for existing in torrent.tags.split(','))
+
+# Concurrent API requests per step, such as the tracker and file list fetches.
+# The API client's connection pool is sized to match so every worker reuses an
+# open connection and qBittorrent is never flooded with parallel requests.
+API_WORKERS = 8
+
+# Save paths walked concurrently by the orphan scan
+SCAN_WORKERS = 8
+
+# Hashes sent per bulk request. Every hash adds 41 bytes to the form body, so
+# very large libraries are split to stay well below qBittorrent's request size limit.
+HASHES_PER_REQUEST = 500
+
+def chunked(items, size=HASHES_PER_REQUEST):
+    """Yield consecutive slices of items with at most size elements each."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def add_tag(client, tag, torrent_hashes):
+    """Add a tag to the given torrents in bulk requests."""
+    for batch in chunked(torrent_hashes):
+        client.torrents_add_tags(torrent_hashes=batch, tags=[tag])
@@ -0,0 +1,78 @@
+import fnmatch
+import os
+import random
+import unittest
+
+from scripts.orphaned import build_dir_filter, compile_patterns, glob_to_regex, remove_nested_save_paths
+
+
+def path(*parts):
+    return os.path.join(os.sep, *parts)
+
+
+def nested_reference(save_paths):
+    # Brute force: keep every normalized path that is not inside another one
+    paths = {os.path.normpath(p) for p in save_paths if p}
+    return sorted(p for p in paths if not any(q != p and os.path.commonpath([p, q]) == q for q in paths))
+
+
+class RemoveNestedSavePathsTest(unittest.TestCase):
+    def test_drops_nested_paths(self):
+        save_paths = [path('data'), path('data', 'movies'), path('data', 'tv', 'anime'), path('other')]
+        self.assertEqual(sorted(remove_nested_save_paths(save_paths)), [path('data'), path('other')])
+
+    def test_keeps_siblings_sharing_a_prefix(self):
+        # ' ' and '-' sort before the separator, so these land between '/a' and '/a/c'
+        save_paths = [path('a'), path('a b'), path('a-b'), path('a', 'c'), path('ab')]
+        self.assertEqual(sorted(remove_nested_save_paths(save_paths)), [path('a'), path('a b'), path('a-b'), path('ab')])
+
+    def test_normalizes_and_deduplicates(self):
+        save_paths = [path('a') + os.sep, path('a'), path('b', '..', 'a', 'c'), '', None]
+        self.assertEqual(remove_nested_save_paths(save_paths), [path('a')])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        names = ['a', 'a b', 'a-b', 'a.b', 'ab', 'b']
+        for _ in range(200):
+            save_paths = [path(*rng.choices(names, k=rng.randint(1, 3))) for _ in range(rng.randint(1, 8))]
+            self.assertEqual(sorted(remove_nested_save_paths(save_paths)), nested_reference(save_paths))
+
+
+PATTERNS = ['*.nfo', '*.!qB', 'sample*', '?.txt', 'Thumbs.db', '*.part[0-9]', '[!a]*.mkv', 'a+b(1)$.^*', '*[*', '*.tar.*']
+NAMES = ['movie.nfo', 'movie.NFO', 'file.!qB', 'sample.mkv', 'Sample.mkv', 'a.txt', 'ab.txt', 'Thumbs.db',
+         'x.part1', 'x.partA', 'a.mkv', 'b.mkv', 'a+b(1)$.^c', 'ab(1)$.^c', 'x[y', 'x.tar.gz', 'x.tar',
+         'line\nbreak.nfo', '.nfo', 'nfo']
+
+
+class GlobToRegexTest(unittest.TestCase):
+    def test_single_patterns_match_like_fnmatch(self):
+        for pattern in PATTERNS:
+            regex = compile_patterns([pattern])
+            for name in NAMES:
+                with self.subTest(pattern=pattern, name=name):
+                    self.assertEqual(regex.match(name) is not None, fnmatch.fnmatch(name, pattern))
+
+    def test_combined_patterns_match_like_any_fnmatch(self):
+        regex = compile_patterns(PATTERNS)
+        for name in NAMES:
+            with self.subTest(name=name):
+                self.assertEqual(regex.match(name) is not None, any(fnmatch.fnmatch(name, p) for p in PATTERNS))
+
+    def test_simple_globs_skip_fnmatch_translate(self):
+        self.assertEqual(glob_to_regex('*.nfo'), r'.*\.nfo\Z')
+        self.assertEqual(glob_to_regex('[ab].nfo'), fnmatch.translate('[ab].nfo'))
+
+    def test_no_patterns(self):
+        self.assertIsNone(compile_patterns([]))
+
+    def test_dir_filter_matches_like_fnmatch(self):
+        exclude_dirs = [path('data', 'skip'), path('data', '*', 'tmp'), path('data', '.*')]
+        is_excluded_dir = build_dir_filter(exclude_dirs)
+        for directory in [path('data', 'skip'), path('data', 'skipped'), path('data', 'tv', 'tmp'),
+                          path('data', 'tv', 'tmp', 'x'), path('data', '.cache'), path('data', 'tv')]:
+            with self.subTest(directory=directory):
+                self.assertEqual(is_excluded_dir(directory), any(fnmatch.fnmatch(directory, d) for d in exclude_dirs))
+
+
+if __name__ == '__main__':
+    unittest.main()
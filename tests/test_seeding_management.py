@@ -0,0 +1,50 @@
+import unittest
+from types import SimpleNamespace
+
+from scripts.seeding_management import apply_seed_limits
+
+
+class FakeClient:
+    def __init__(self):
+        self.share_limits = []
+
+    def torrents_set_share_limits(self, ratio_limit, seeding_time_limit, inactive_seeding_time_limit, torrent_hashes):
+        self.share_limits.append((ratio_limit, seeding_time_limit, list(torrent_hashes)))
+
+
+def make_torrent(torrent_hash, *urls):
+    return SimpleNamespace(hash=torrent_hash, ratio_limit=-2, seeding_time_limit=-2,
+                           trackers=[SimpleNamespace(url=url) for url in urls])
+
+
+class ApplySeedLimitsTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.config = {'tracker_tags': {
+            'aither': {'tag': 'AITHER', 'seed_time_limit': 100, 'seed_ratio_limit': 1},
+            'blutopia': {'tag': 'BLU', 'seed_ratio_limit': 1.5},
+            'other': {'tag': 'OTHER'},
+        }}
+
+    def test_one_request_per_limit_group(self):
+        torrents = [
+            make_torrent('a', '** [DHT] **', 'https://tracker.aither.cc/announce', 'udp://tracker.aither.cc:80'),
+            make_torrent('b', 'https://blutopia.cc/announce'),
+            make_torrent('c', 'https://tracker.aither.cc/announce'),
+        ]
+        apply_seed_limits(self.client, self.config, torrents)
+        self.assertEqual(self.client.share_limits, [(1, 100, ['a', 'c']), (1.5, -2, ['b'])])
+
+    def test_first_configured_host_wins(self):
+        torrents = [make_torrent('a', 'https://blutopia.cc/announce', 'https://tracker.aither.cc/announce')]
+        apply_seed_limits(self.client, self.config, torrents)
+        self.assertEqual(self.client.share_limits, [(1.5, -2, ['a'])])
+
+    def test_trackers_without_limits_send_nothing(self):
+        torrents = [make_torrent('a', 'https://other.org/announce'), make_torrent('b', 'https://unknown.org/announce')]
+        apply_seed_limits(self.client, self.config, torrents)
+        self.assertEqual(self.client.share_limits, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import datetime
+import random
+import time
+import unittest
+from types import SimpleNamespace
+
+from scripts.tag_by_age import AGE_TAGS, month_start_timestamps, tag_by_age
+
+
+def months_old(timestamp, now):
+    added = datetime.datetime.fromtimestamp(timestamp)
+    return (now.year - added.year) * 12 + (now.month - added.month)
+
+
+def expected_tag(timestamp, now):
+    # The original elif ladder on the calendar month difference
+    age = months_old(timestamp, now)
+    for months, tag in enumerate(('>1_month', '>2_months', '>3_months', '>4_months', '>5_months', '>6_months'), 1):
+        if age <= months:
+            return tag
+    return '6_months_plus'
+
+
+class FakeClient:
+    def __init__(self):
+        self.requests = []
+
+    def torrents_add_tags(self, torrent_hashes, tags):
+        self.requests.append((tags, list(torrent_hashes)))
+
+
+class MonthStartTimestampsTest(unittest.TestCase):
+    def test_local_midnight_on_the_first_of_previous_months(self):
+        today = datetime.date.today()
+        starts = month_start_timestamps(13)
+        self.assertEqual(len(starts), 13)
+        for offset, start in enumerate(starts, 1):
+            date = datetime.datetime.fromtimestamp(start)
+            self.assertEqual((date.day, date.hour, date.minute, date.second), (1, 0, 0, 0))
+            self.assertEqual((today.year - date.year) * 12 + today.month - date.month, offset)
+
+
+class TagByAgeTest(unittest.TestCase):
+    def tag(self, timestamps, tags=''):
+        client = FakeClient()
+        torrents = [SimpleNamespace(hash=str(i), name=str(i), added_on=t, tags=tags) for i, t in enumerate(timestamps)]
+        tag_by_age(client, torrents, {})
+        return client.requests
+
+    def test_buckets_match_calendar_month_ladder(self):
+        now = datetime.datetime.now()
+        rng = random.Random(0)
+        timestamps = [time.time() - rng.randint(-86400, 400 * 86400) for _ in range(2000)]
+        for start in month_start_timestamps(len(AGE_TAGS)):
+            timestamps += [start - 1, start, start + 1]
+
+        tagged = {}
+        for tags, torrent_hashes in self.tag(timestamps):
+            for torrent_hash in torrent_hashes:
+                tagged[int(torrent_hash)] = tags[0]
+        self.assertEqual(tagged, {i: expected_tag(t, now) for i, t in enumerate(timestamps)})
+
+    def test_one_request_per_bucket(self):
+        starts = month_start_timestamps(2)
+        requests = self.tag([time.time(), time.time(), starts[1] - 1])
+        self.assertEqual(requests, [(['>3_months'], ['2']), (['>1_month'], ['0', '1'])])
+
+    def test_already_tagged_torrents_are_skipped(self):
+        self.assertEqual(self.tag([time.time()], tags='seed, >1_month'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
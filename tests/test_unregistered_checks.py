@@ -0,0 +1,109 @@
+import unittest
+from types import SimpleNamespace
+
+from scripts.unregistered_checks import delete_torrents_and_files, unregistered_checks
+
+
+class FakeTorrents:
+    def __init__(self):
+        self.deleted = []
+
+    def delete(self, delete_files, torrent_hashes):
+        self.deleted.append((delete_files, list(torrent_hashes)))
+
+
+class FakeClient:
+    def __init__(self):
+        self.torrents = FakeTorrents()
+        self.added_tags = {}
+
+    def torrents_add_tags(self, torrent_hashes, tags):
+        for tag in tags:
+            self.added_tags.setdefault(tag, []).extend(torrent_hashes)
+
+
+def tracker(msg, status=4):
+    return SimpleNamespace(msg=msg, status=status)
+
+
+def make_torrent(torrent_hash, save_path, *trackers, tags=''):
+    return SimpleNamespace(hash=torrent_hash, name=torrent_hash.upper(), save_path=save_path, tags=tags, trackers=list(trackers))
+
+
+UNREGISTERED = tracker('Unregistered torrent')
+WORKING = tracker('', status=2)
+
+
+class DeleteTorrentsAndFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.client = SimpleNamespace(torrents=FakeTorrents())
+        self.delete_tags = ['unregistered', 'unregistered:crossseeding']
+        self.delete_files = {'unregistered': True, 'unregistered:crossseeding': False}
+
+    def delete(self, torrents, added_tags=None, dry_run=False):
+        delete_torrents_and_files(self.client, torrents, added_tags or {}, {}, True, self.delete_tags, self.delete_files, dry_run)
+        return self.client.torrents.deleted
+
+    def test_cross_seed_tag_does_not_match_unregistered_rule(self):
+        torrents = [SimpleNamespace(hash='cross', name='Cross', tags='unregistered:crossseeding')]
+        self.assertEqual(self.delete(torrents), [(False, ['cross'])])
+
+    def test_unregistered_tag_deletes_files(self):
+        torrents = [SimpleNamespace(hash='unreg', name='Unreg', tags='movies, unregistered')]
+        self.assertEqual(self.delete(torrents), [(True, ['unreg'])])
+
+    def test_tag_added_this_run_is_matched(self):
+        torrents = [SimpleNamespace(hash='new', name='New', tags='')]
+        self.assertEqual(self.delete(torrents, added_tags={'new': 'unregistered:crossseeding'}), [(False, ['new'])])
+
+    def test_dry_run_deletes_nothing(self):
+        torrents = [SimpleNamespace(hash='unreg', name='Unreg', tags='unregistered')]
+        self.assertEqual(self.delete(torrents, dry_run=True), [])
+
+
+class UnregisteredChecksTest(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.config = {
+            'default_unregistered_tag': 'unregistered',
+            'cross_seeding_tag': 'unregistered:crossseeding',
+            'unregistered': ['unregistered torrent', 'starts_with:torrent not found'],
+        }
+
+    def check(self, torrents):
+        return unregistered_checks(self.client, torrents, self.config, False, [], {}, False)
+
+    def test_fully_unregistered_path_gets_default_tag(self):
+        torrents = [make_torrent('a', '/data/a', UNREGISTERED), make_torrent('b', '/data/a', tracker('Torrent not found in database'))]
+        self.check(torrents)
+        self.assertEqual(self.client.added_tags, {'unregistered': ['a', 'b']})
+
+    def test_mixed_path_gets_cross_seed_tag_in_any_order(self):
+        for order in (1, -1):
+            self.client = FakeClient()
+            torrents = [make_torrent('a', '/data/a', UNREGISTERED), make_torrent('b', '/data/a', WORKING)][::order]
+            self.check(torrents)
+            self.assertEqual(self.client.added_tags, {'unregistered:crossseeding': ['a']})
+
+    def test_paths_are_counted_by_torrents_not_trackers(self):
+        torrents = [make_torrent('a', '/data/a', UNREGISTERED, UNREGISTERED), make_torrent('b', '/data/a', WORKING)]
+        file_paths, unregistered_counts = self.check(torrents)
+        self.assertEqual(unregistered_counts, {'/data/a': 1})
+        self.assertEqual(file_paths, {'/data/a': ['a', 'b']})
+        self.assertEqual(self.client.added_tags, {'unregistered:crossseeding': ['a']})
+
+    def test_only_not_working_trackers_count(self):
+        torrents = [make_torrent('a', '/data/a', tracker('Unregistered torrent', status=2))]
+        _, unregistered_counts = self.check(torrents)
+        self.assertEqual(unregistered_counts, {})
+        self.assertEqual(self.client.added_tags, {})
+
+    def test_already_tagged_torrent_is_counted_but_not_tagged_again(self):
+        torrents = [make_torrent('a', '/data/a', UNREGISTERED, tags='unregistered'), make_torrent('b', '/data/a', UNREGISTERED)]
+        _, unregistered_counts = self.check(torrents)
+        self.assertEqual(unregistered_counts, {'/data/a': 2})
+        self.assertEqual(self.client.added_tags, {'unregistered': ['b']})
+
+
+if __name__ == '__main__':
+    unittest.main()